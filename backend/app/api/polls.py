@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request
 
-from app.core.redis import get_redis
+from app.core.config import settings
+from app.core.redis import get_redis, get_read_redis
 from app.models.poll import (
     CreatePollRequest,
     CreatePollResponse,
+    BatchCreatePollRequest,
+    BatchCreatePollResponse,
     PollResponse,
+    PollTimeSeriesResponse,
+    TimeSeriesResolution,
+    TrendingPollsResponse,
     VoteRequest,
     VoteResponse
 )
-from app.services import PollService, VoteService
-from app.api.websocket import broadcast_vote_update
+from app.services import PollService, VoteService, TimeSeriesService, TrendingService
+from app.api.websocket import broadcast_vote_update, schedule_ranked_update
 
 router = APIRouter(prefix="/api/polls", tags=["polls"])
 
@@ -27,7 +33,8 @@ async def create_poll(data: CreatePollRequest, request: Request):
             duration=data.duration,
             allow_multiple=data.allow_multiple,
             min_selection=data.min_selection,
-            max_selection=data.max_selection
+            max_selection=data.max_selection,
+            voting_method=data.voting_method
         )
 
         return CreatePollResponse(
@@ -43,11 +50,52 @@ async def create_poll(data: CreatePollRequest, request: Request):
         )
 
 
+@router.post("/batch", response_model=BatchCreatePollResponse)
+async def create_polls(data: BatchCreatePollRequest, request: Request):
+    """批量创建投票（按请求顺序返回）"""
+    redis = get_redis()
+    poll_service = PollService(redis)
+
+    try:
+        created = await poll_service.create_polls(data.polls)
+
+        return BatchCreatePollResponse(
+            polls=[
+                CreatePollResponse(
+                    poll_id=poll_id,
+                    url=f"/p/{poll_id}",
+                    expires_at=expires_at
+                )
+                for poll_id, expires_at in created
+            ]
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"code": "CREATE_FAILED", "message": str(e)}
+        )
+
+
+@router.get("/trending", response_model=TrendingPollsResponse)
+async def get_trending_polls(
+    request: Request,
+    limit: int = Query(default=10, ge=1, description="返回数量")
+):
+    """获取热门投票（按近期投票速率排序）"""
+    redis = get_redis()
+    trending_service = TrendingService(redis)
+
+    polls = await trending_service.get_trending(min(limit, settings.trending_max_limit))
+
+    return TrendingPollsResponse(polls=polls)
+
+
 @router.get("/{poll_id}", response_model=PollResponse)
 async def get_poll(poll_id: str, request: Request):
     """获取投票详情"""
     redis = get_redis()
-    poll_service = PollService(redis)
+    poll_service = PollService(redis, read_redis=get_read_redis())
 
     poll = await poll_service.get_poll(poll_id)
 
@@ -57,9 +105,27 @@ async def get_poll(poll_id: str, request: Request):
     return poll
 
 
+@router.get("/{poll_id}/timeseries", response_model=PollTimeSeriesResponse)
+async def get_poll_timeseries(
+    poll_id: str,
+    request: Request,
+    resolution: TimeSeriesResolution = Query(default="1m", description="分辨率")
+):
+    """获取投票趋势（按分辨率降采样的时间序列）"""
+    redis = get_redis()
+    timeseries_service = TimeSeriesService(redis, read_redis=get_read_redis())
+
+    timeseries = await timeseries_service.get_timeseries(poll_id, resolution)
+
+    if not timeseries:
+        raise HTTPException(status_code=404, detail={"code": "POLL_NOT_FOUND"})
+
+    return timeseries
+
+
 @router.post("/{poll_id}/vote", response_model=VoteResponse)
 async def vote(poll_id: str, data: VoteRequest, request: Request):
-    """投票（支持单选和多选）
+    """投票（支持单选、多选和排序复选）
 
     注意：不进行服务端IP检测，投票限制由客户端本地存储实现
     """
@@ -69,14 +135,18 @@ async def vote(poll_id: str, data: VoteRequest, request: Request):
     success, error_msg, options, total_votes = await vote_service.vote(
         poll_id=poll_id,
         option_id=data.option_id,
-        option_ids=data.option_ids
+        option_ids=data.option_ids,
+        ranking=data.ranking
     )
 
     if not success:
         raise HTTPException(status_code=400, detail=error_msg)
 
-    # 广播实时更新（WebSocket）- 支持多选
-    voted_option_ids = data.option_ids if data.option_ids else ([data.option_id] if data.option_id else [])
+    # 广播实时更新（WebSocket）- 支持多选，排序复选只广播首选
+    if data.ranking:
+        voted_option_ids = data.ranking[:1]
+    else:
+        voted_option_ids = data.option_ids if data.option_ids else ([data.option_id] if data.option_id else [])
     for opt_id in voted_option_ids:
         voted_option = next((opt for opt in options if opt.id == opt_id), None)
         if voted_option:
@@ -87,6 +157,10 @@ async def vote(poll_id: str, data: VoteRequest, request: Request):
                 total_votes=total_votes
             )
 
+    # 排序复选：逐轮结果按更新窗口合并推送，不在投票请求中计票
+    if data.ranking:
+        schedule_ranked_update(poll_id, [opt.id for opt in options])
+
     return VoteResponse(
         success=True,
         options=options,
@@ -1,5 +1,13 @@
+import re
+import time
+import asyncio
 import socketio
-from typing import Dict, Set
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.redis import get_redis, get_read_redis
+from app.services import PollService, TallyService
 
 # 创建Socket.IO服务器
 sio = socketio.AsyncServer(
@@ -9,9 +17,85 @@ sio = socketio.AsyncServer(
     engineio_logger=False
 )
 
+# 投票ID格式（8位十六进制，见 PollService.generate_poll_id），格式不符的直接拒绝
+POLL_ID_PATTERN = re.compile(r"[0-9a-f]{8}")
+
 # 存储房间（poll_id -> set of sids）
 rooms: Dict[str, Set[str]] = {}
 
+# 投票快照（poll_id -> (刷新时间, 快照)），按最近使用顺序淘汰
+snapshots: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+# 不存在的投票（poll_id -> 查询时间），小容量LRU，刷新窗口内重复加入直接拒绝
+_missing_polls: "OrderedDict[str, float]" = OrderedDict()
+# 正在刷新的快照，同一窗口内的并发加入者共享一次读取
+_snapshot_tasks: Dict[str, asyncio.Task] = {}
+# 待推送的排序复选结果（每个投票每个窗口最多一条）
+_ranked_update_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _load_snapshot(poll_id: str) -> Optional[Dict[str, Any]]:
+    poll_service = PollService(get_redis(), read_redis=get_read_redis())
+    try:
+        poll = await poll_service.get_poll(poll_id)
+    finally:
+        _snapshot_tasks.pop(poll_id, None)
+
+    now = time.monotonic()
+
+    if poll is None:
+        _missing_polls[poll_id] = now
+        _missing_polls.move_to_end(poll_id)
+        while len(_missing_polls) > settings.snapshot_missing_cache_size:
+            _missing_polls.popitem(last=False)
+        return None
+
+    _missing_polls.pop(poll_id, None)
+    snapshot = poll.model_dump()
+    snapshots[poll_id] = (now, snapshot)
+    snapshots.move_to_end(poll_id)
+    while len(snapshots) > settings.snapshot_cache_size:
+        snapshots.popitem(last=False)
+
+    return snapshot
+
+
+async def get_poll_snapshot(poll_id: str) -> Optional[Dict[str, Any]]:
+    """
+    获取投票快照
+
+    每个刷新窗口内最多读取一次Redis，所有加入者共享同一份快照
+    """
+    now = time.monotonic()
+
+    missing_at = _missing_polls.get(poll_id)
+    if missing_at is not None and now - missing_at < settings.snapshot_refresh_interval:
+        return None
+
+    cached = snapshots.get(poll_id)
+    if cached and now - cached[0] < settings.snapshot_refresh_interval:
+        snapshot = cached[1]
+        snapshots.move_to_end(poll_id)
+    else:
+        task = _snapshot_tasks.get(poll_id)
+        if task is None:
+            task = asyncio.create_task(_load_snapshot(poll_id))
+            _snapshot_tasks[poll_id] = task
+        snapshot = await asyncio.shield(task)
+
+    if snapshot and snapshot["expires_at"] <= time.time():
+        return None
+    return snapshot
+
+
+def _remove_from_room(sid: str, poll_id: str) -> None:
+    members = rooms.get(poll_id)
+    if members is None:
+        return
+
+    members.discard(sid)
+    if not members:
+        del rooms[poll_id]
+
 
 @sio.event
 async def connect(sid: str, environ: dict, auth: dict):
@@ -26,18 +110,28 @@ async def disconnect(sid: str):
     print(f"WebSocket disconnected: {sid}")
 
     # 从所有房间移除
-    for poll_id, members in rooms.items():
-        if sid in members:
-            members.discard(sid)
-            await sio.leave_room(sid, poll_id)
+    for poll_id in [pid for pid, members in rooms.items() if sid in members]:
+        _remove_from_room(sid, poll_id)
+        await sio.leave_room(sid, poll_id)
 
 
 @sio.event
 async def join_poll(sid: str, data: dict):
-    """加入投票房间"""
-    poll_id = data.get('poll_id')
-    if not poll_id:
-        return
+    """加入投票房间
+
+    校验投票存在后加入房间，并通过ack返回当前完整快照
+    """
+    poll_id = data.get('poll_id') if isinstance(data, dict) else None
+    if not isinstance(poll_id, str) or not POLL_ID_PATTERN.fullmatch(poll_id):
+        return {'success': False, 'code': 'INVALID_POLL_ID'}
+
+    try:
+        snapshot = await get_poll_snapshot(poll_id)
+    except Exception as e:
+        return {'success': False, 'code': 'JOIN_FAILED', 'message': str(e)}
+
+    if snapshot is None:
+        return {'success': False, 'code': 'POLL_NOT_FOUND'}
 
     # 加入房间
     await sio.enter_room(sid, poll_id)
@@ -49,6 +143,8 @@ async def join_poll(sid: str, data: dict):
     print(f"Client {sid} joined poll {poll_id}")
     print(f"Room {poll_id} members: {len(rooms[poll_id])}")
 
+    return {'success': True, 'poll': snapshot}
+
 
 @sio.event
 async def leave_poll(sid: str, data: dict):
@@ -59,9 +155,7 @@ async def leave_poll(sid: str, data: dict):
 
     # 离开房间
     await sio.leave_room(sid, poll_id)
-
-    if poll_id in rooms:
-        rooms[poll_id].discard(sid)
+    _remove_from_room(sid, poll_id)
 
     print(f"Client {sid} left poll {poll_id}")
 
@@ -76,6 +170,15 @@ async def broadcast_vote_update(poll_id: str, option_id: int, votes: int, total_
         votes: 该选项的投票数
         total_votes: 总投票数
     """
+    # 同步更新共享快照，后续加入者无需等待刷新窗口
+    cached = snapshots.get(poll_id)
+    if cached and cached[1]:
+        snapshot = cached[1]
+        for option in snapshot["options"]:
+            if option["id"] == option_id:
+                option["votes"] = votes
+        snapshot["total_votes"] = total_votes
+
     if poll_id in rooms and rooms[poll_id]:
         await sio.emit(
             'vote_update',
@@ -89,8 +192,48 @@ async def broadcast_vote_update(poll_id: str, option_id: int, votes: int, total_
         print(f"Broadcast to poll {poll_id}: option_{option_id} = {votes} votes")
 
 
+def schedule_ranked_update(poll_id: str, option_ids: List[int]) -> None:
+    """
+    安排一次排序复选结果推送
+
+    同一更新窗口内的多次投票合并为一次计票和一条 ranked_update 消息
+    """
+    if poll_id in _ranked_update_tasks:
+        return
+    if not rooms.get(poll_id) and poll_id not in snapshots:
+        return
+
+    _ranked_update_tasks[poll_id] = asyncio.create_task(
+        _broadcast_ranked_update(poll_id, option_ids)
+    )
+
+
+async def _broadcast_ranked_update(poll_id: str, option_ids: List[int]) -> None:
+    await asyncio.sleep(settings.tally_refresh_interval)
+    # 计票期间的新投票安排到下一个窗口
+    _ranked_update_tasks.pop(poll_id, None)
+
+    try:
+        ranked_result = await TallyService(get_redis()).get_ranked_result(poll_id, option_ids)
+    except Exception as e:
+        print(f"Ranked tally failed for poll {poll_id}: {e}")
+        return
+
+    payload = ranked_result.model_dump()
+
+    cached = snapshots.get(poll_id)
+    if cached and cached[1]:
+        cached[1]["ranked_result"] = payload
+
+    if poll_id in rooms and rooms[poll_id]:
+        await sio.emit('ranked_update', payload, room=poll_id)
+        print(f"Broadcast to poll {poll_id}: ranked result v{ranked_result.version}")
+
+
 async def broadcast_poll_expired(poll_id: str):
     """广播投票过期"""
+    snapshots.pop(poll_id, None)
+
     if poll_id in rooms and rooms[poll_id]:
         await sio.emit('poll_expired', room=poll_id)
         print(f"Poll {poll_id} expired notification sent")
@@ -1,4 +1,4 @@
 from .config import settings
-from .redis import get_redis, redis_client, init_redis, close_redis
+from .redis import get_redis, get_read_redis, redis_client, init_redis, close_redis
 
-__all__ = ["settings", "get_redis", "redis_client", "init_redis", "close_redis"]
+__all__ = ["settings", "get_redis", "get_read_redis", "redis_client", "init_redis", "close_redis"]
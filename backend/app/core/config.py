@@ -10,6 +10,15 @@ class Settings(BaseSettings):
     redis_db: int = 0
     redis_password: str = ""
 
+    # Redis只读副本（逗号分隔的 host:port，留空则所有读请求走主节点）
+    redis_replicas: Union[str, List[str]] = ""
+    # 副本陈旧度上限（秒）：健康检查时副本的 slave_repl_offset 须不小于主节点
+    # 该时长之前的 master_repl_offset，否则回退主节点。由于按检查间隔采样，
+    # 实际读到的数据最多落后约 redis_replica_max_lag + redis_replica_health_interval 秒
+    redis_replica_max_lag: int = 10
+    redis_replica_health_interval: int = 5  # 副本健康检查间隔（秒）
+    redis_replica_timeout: float = 0.5  # 副本连接/读取及健康检查的超时（秒）
+
     # 服务器配置
     host: str = "::"
     port: int = 8000
@@ -20,18 +29,21 @@ class Settings(BaseSettings):
     # 生产环境：通过nginx统一暴露，无需CORS（前后端同源）
     cors_origins: Union[str, List[str]] = "http://localhost:5173"
 
-    @field_validator('cors_origins', mode='before')
+    @field_validator('cors_origins', 'redis_replicas', mode='before')
     @classmethod
-    def parse_cors_origins(cls, v):
+    def parse_comma_separated(cls, v):
         if isinstance(v, str):
             # 支持逗号分隔的字符串
-            return [origin.strip() for origin in v.split(',') if origin.strip()]
+            return [item.strip() for item in v.split(',') if item.strip()]
         return v
 
     # 业务配置
     max_poll_options: int = 20
     max_poll_title_length: int = 100
     max_option_text_length: int = 50
+    max_batch_polls: int = 1000
+    # 投票ID冲突时的最大重试轮数（每轮一次Pipeline往返）
+    poll_id_max_attempts: int = 3
 
     # 持续时长配置（秒）
     duration_map: dict[str, int] = {
@@ -45,6 +57,33 @@ class Settings(BaseSettings):
         "10d": 864000
     }
 
+    # 时间序列分辨率（秒），原始数据按分钟存储
+    timeseries_resolution_map: dict[str, int] = {
+        "1m": 60,
+        "5m": 300,
+        "1h": 3600
+    }
+    # 每个选项最多返回的桶数（1m约12小时，5m约2.5天，1h覆盖最长的10天投票）
+    timeseries_max_buckets: int = 720
+
+    # 热门投票配置
+    # 热门查询脚本会读取 poll:{id} 等未声明的键，且会写入索引：
+    # 只在主节点执行，不支持 Redis Cluster
+    trending_decay_seconds: int = 1800  # 投票速率的衰减时间常数
+    trending_max_limit: int = 50
+    trending_prune_batch: int = 256  # 每次查询最多清理的过期投票数
+    trending_vote_prune_batch: int = 16  # 每次投票最多清理的过期投票数
+    trending_cache_ttl: float = 5.0  # 进程内缓存时长，0为禁用
+
+    # WebSocket加入时的投票快照
+    snapshot_refresh_interval: float = 1.0  # 快照刷新窗口（秒）
+    snapshot_cache_size: int = 10000  # 缓存的快照数上限，超出后淘汰最久未使用的
+    snapshot_missing_cache_size: int = 1024  # 不存在投票的缓存上限
+
+    # 排序复选结果缓存
+    tally_cache_size: int = 1000  # 缓存的投票数上限
+    tally_refresh_interval: float = 1.0  # 每个投票最多每隔多少秒重新计票一次
+
     class Config:
         env_file = ".env"
         case_sensitive = False
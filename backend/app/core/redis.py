@@ -1,37 +1,91 @@
+import time
+import asyncio
+from collections import deque
 import redis.asyncio as redis
-from typing import Optional
+from redis.exceptions import ConnectionError, TimeoutError
+from typing import Awaitable, Callable, List, Optional, TypeVar
 from .config import settings
 
+T = TypeVar("T")
+
 # Redis连接池
 redis_pool: Optional[redis.ConnectionPool] = None
 redis_client: Optional[redis.Redis] = None
 
+# 只读副本
+replica_clients: List[redis.Redis] = []
+healthy_replicas: List[redis.Redis] = []
+_replica_cursor = 0
+_replica_health_task: Optional[asyncio.Task] = None
+# 主节点复制偏移量采样：(采样时间, master_repl_offset)
+_primary_offsets: deque[tuple[float, int]] = deque()
 
-async def init_redis() -> None:
-    """初始化Redis连接池"""
-    global redis_pool, redis_client
 
-    redis_pool = redis.ConnectionPool(
-        host=settings.redis_host,
-        port=settings.redis_port,
+def _create_pool(
+    host: str,
+    port: int,
+    socket_timeout: Optional[float] = None
+) -> redis.ConnectionPool:
+    return redis.ConnectionPool(
+        host=host,
+        port=port,
         db=settings.redis_db,
         password=settings.redis_password if settings.redis_password else None,
         max_connections=50,
         decode_responses=True,
         socket_keepalive=True,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=socket_timeout,
         health_check_interval=30
     )
 
+
+def _parse_address(address: str) -> tuple[str, int]:
+    """解析 host:port（IPv6 可写作 [::1]:6379）"""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return address.strip("[]"), settings.redis_port
+    return host.strip("[]"), int(port)
+
+
+async def init_redis() -> None:
+    """初始化Redis连接池"""
+    global redis_pool, redis_client, _replica_health_task
+
+    redis_pool = _create_pool(settings.redis_host, settings.redis_port)
     redis_client = redis.Redis(connection_pool=redis_pool)
 
     # 测试连接
     await redis_client.ping()
     print(f"✓ Redis connected: {settings.redis_host}:{settings.redis_port}")
 
+    # 初始化只读副本（不可用的副本由健康检查剔除，不阻塞启动）
+    # 副本设置较短的超时，失联时读请求能尽快回退到主节点
+    for address in settings.redis_replicas:
+        host, port = _parse_address(address)
+        pool = _create_pool(host, port, socket_timeout=settings.redis_replica_timeout)
+        replica_clients.append(redis.Redis(connection_pool=pool))
+
+    if replica_clients:
+        await refresh_replica_health()
+        _replica_health_task = asyncio.create_task(_replica_health_loop())
+        print(f"✓ Redis replicas: {len(healthy_replicas)}/{len(replica_clients)} healthy")
+
 
 async def close_redis() -> None:
     """关闭Redis连接"""
-    global redis_pool, redis_client
+    global redis_pool, redis_client, _replica_health_task
+
+    if _replica_health_task:
+        _replica_health_task.cancel()
+        _replica_health_task = None
+
+    for replica in replica_clients:
+        await replica.aclose()
+        await replica.connection_pool.aclose()
+    replica_clients.clear()
+    healthy_replicas.clear()
+    _primary_offsets.clear()
 
     if redis_client:
         await redis_client.aclose()
@@ -47,3 +101,104 @@ def get_redis() -> redis.Redis:
     if redis_client is None:
         raise RuntimeError("Redis not initialized")
     return redis_client
+
+
+def get_read_redis() -> redis.Redis:
+    """获取只读Redis客户端
+
+    在健康副本间轮询，没有可用副本时返回主节点
+    """
+    global _replica_cursor
+
+    if not healthy_replicas:
+        return get_redis()
+
+    _replica_cursor = (_replica_cursor + 1) % len(healthy_replicas)
+    return healthy_replicas[_replica_cursor]
+
+
+def mark_replica_unhealthy(replica: redis.Redis) -> None:
+    """将副本移出可用列表，等待下一次健康检查恢复"""
+    if replica in healthy_replicas:
+        healthy_replicas.remove(replica)
+
+
+async def _replication_info(client: redis.Redis) -> Optional[dict]:
+    """读取 INFO replication，超时或出错返回None"""
+    try:
+        return await asyncio.wait_for(
+            client.info("replication"),
+            timeout=settings.redis_replica_timeout
+        )
+    except Exception:
+        return None
+
+
+def _required_offset() -> int:
+    """
+    副本至少应达到的复制偏移量
+
+    取 redis_replica_max_lag 秒前主节点的偏移量；采样历史不足时取最早的采样（更严格）
+    """
+    deadline = time.monotonic() - settings.redis_replica_max_lag
+    required = _primary_offsets[0][1]
+    for sampled_at, offset in _primary_offsets:
+        if sampled_at > deadline:
+            break
+        required = offset
+    return required
+
+
+async def _check_replica(replica: redis.Redis, required_offset: int) -> bool:
+    """副本在线，且已应用主节点 redis_replica_max_lag 秒前的全部写入"""
+    info = await _replication_info(replica)
+    if info is None or info.get("master_link_status") != "up":
+        return False
+
+    return int(info.get("slave_repl_offset", -1)) >= required_offset
+
+
+async def refresh_replica_health() -> None:
+    """刷新可用副本列表"""
+    primary_info = await _replication_info(get_redis())
+    if primary_info is None:
+        # 无法确定主节点进度，暂不使用副本
+        healthy_replicas.clear()
+        return
+
+    now = time.monotonic()
+    _primary_offsets.append((now, int(primary_info.get("master_repl_offset", 0))))
+    # 只保留判断所需的采样窗口
+    while len(_primary_offsets) > 1 and _primary_offsets[1][0] <= now - settings.redis_replica_max_lag:
+        _primary_offsets.popleft()
+
+    required_offset = _required_offset()
+    results = await asyncio.gather(*(_check_replica(r, required_offset) for r in replica_clients))
+    healthy_replicas[:] = [r for r, ok in zip(replica_clients, results) if ok]
+
+
+async def _replica_health_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.redis_replica_health_interval)
+        await refresh_replica_health()
+
+
+async def read_with_fallback(
+    read: Callable[[redis.Redis], Awaitable[Optional[T]]],
+    primary: redis.Redis,
+    replica: redis.Redis
+) -> Optional[T]:
+    """
+    优先在副本上读取，副本不可用或未命中时回退到主节点
+
+    未命中也回退，是因为刚创建的投票可能尚未同步到副本
+    """
+    if replica is not primary:
+        try:
+            result = await read(replica)
+            if result is not None:
+                return result
+        except (ConnectionError, TimeoutError, asyncio.TimeoutError):
+            mark_replica_unhealthy(replica)
+
+    return await read(primary)
@@ -1,17 +1,39 @@
 from .poll import (
     CreatePollRequest,
     CreatePollResponse,
+    BatchCreatePollRequest,
+    BatchCreatePollResponse,
     PollResponse,
     VoteRequest,
     VoteResponse,
-    PollOption
+    PollOption,
+    OptionTimeSeries,
+    PollTimeSeriesResponse,
+    TimeSeriesResolution,
+    TrendingPoll,
+    TrendingPollsResponse,
+    VotingMethod,
+    RankedTally,
+    RankedRound,
+    RankedResult
 )
 
 __all__ = [
     "CreatePollRequest",
     "CreatePollResponse",
+    "BatchCreatePollRequest",
+    "BatchCreatePollResponse",
     "PollResponse",
     "VoteRequest",
     "VoteResponse",
-    "PollOption"
+    "PollOption",
+    "OptionTimeSeries",
+    "PollTimeSeriesResponse",
+    "TimeSeriesResolution",
+    "TrendingPoll",
+    "TrendingPollsResponse",
+    "VotingMethod",
+    "RankedTally",
+    "RankedRound",
+    "RankedResult"
 ]
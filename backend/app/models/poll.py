@@ -1,7 +1,12 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Literal, Optional
 
+from app.core.config import settings
+
 DurationOption = Literal["3m", "30m", "1h", "6h", "1d", "3d", "7d", "10d"]
+TimeSeriesResolution = Literal["1m", "5m", "1h"]
+# plurality: 单选/多选计票；approval: 认可投票（任选多项）；ranked: 排序复选（即时决选）
+VotingMethod = Literal["plurality", "approval", "ranked"]
 
 
 class PollOption(BaseModel):
@@ -17,6 +22,7 @@ class CreatePollRequest(BaseModel):
     allow_multiple: bool = Field(default=False, description="是否允许多选")
     min_selection: Optional[int] = Field(default=None, ge=1, description="最少选择数")
     max_selection: Optional[int] = Field(default=None, ge=1, description="最多选择数")
+    voting_method: VotingMethod = Field(default="plurality", description="计票方式")
 
     @field_validator("options")
     @classmethod
@@ -56,6 +62,40 @@ class CreatePollResponse(BaseModel):
     expires_at: int
 
 
+class BatchCreatePollRequest(BaseModel):
+    polls: List[CreatePollRequest] = Field(..., min_length=1, description="投票列表")
+
+    @field_validator("polls", mode="before")
+    @classmethod
+    def validate_polls_count(cls, v):
+        # 在逐个校验投票之前检查数量，超大请求直接拒绝
+        if isinstance(v, list) and len(v) > settings.max_batch_polls:
+            raise ValueError(f"单次最多创建 {settings.max_batch_polls} 个投票")
+        return v
+
+
+class BatchCreatePollResponse(BaseModel):
+    polls: List[CreatePollResponse]
+
+
+class RankedTally(BaseModel):
+    id: int
+    votes: int
+
+
+class RankedRound(BaseModel):
+    round: int
+    tallies: List[RankedTally]
+    exhausted: int = 0
+    eliminated: Optional[int] = None
+
+
+class RankedResult(BaseModel):
+    version: int
+    rounds: List[RankedRound]
+    winner: Optional[int] = None
+
+
 class PollResponse(BaseModel):
     poll_id: str
     title: str
@@ -67,19 +107,28 @@ class PollResponse(BaseModel):
     allow_multiple: bool = False
     min_selection: Optional[int] = None
     max_selection: Optional[int] = None
+    voting_method: VotingMethod = "plurality"
+    ranked_result: Optional[RankedResult] = None
 
 
 class VoteRequest(BaseModel):
     option_id: Optional[int] = Field(default=None, ge=1, description="选项ID（单选）")
+    ranking: Optional[List[int]] = Field(default=None, min_length=1, description="按偏好排序的选项ID（排序复选）")
     option_ids: Optional[List[int]] = Field(default=None, description="选项ID列表（多选）")
 
     @field_validator("option_ids")
     @classmethod
     def validate_option_ids(cls, v: Optional[List[int]], info) -> Optional[List[int]]:
-        # 确保至少提供了 option_id 或 option_ids 之一
+        # 排序选票由 validate_ranking 校验，这里只需确保没有同时提供 option_ids
+        if info.data.get('ranking'):
+            if v:
+                raise ValueError("不能同时提供 ranking 和 option_ids")
+            return v
+
+        # 确保至少提供了 option_id、option_ids 或 ranking 之一
         option_id = info.data.get('option_id')
         if option_id is None and (v is None or len(v) == 0):
-            raise ValueError("必须提供 option_id 或 option_ids")
+            raise ValueError("必须提供 option_id、option_ids 或 ranking")
 
         # 如果同时提供了两者，报错
         if option_id is not None and v is not None and len(v) > 0:
@@ -91,8 +140,48 @@ class VoteRequest(BaseModel):
 
         return v
 
+    @field_validator("ranking")
+    @classmethod
+    def validate_ranking(cls, v: Optional[List[int]], info) -> Optional[List[int]]:
+        if v is None:
+            return v
+
+        if info.data.get('option_id') is not None:
+            raise ValueError("不能同时提供 ranking 和 option_id")
+
+        if len(v) != len(set(v)):
+            raise ValueError("选项ID不能重复")
+
+        return v
+
 
 class VoteResponse(BaseModel):
     success: bool
     options: List[PollOption]
     total_votes: int
+
+
+class OptionTimeSeries(BaseModel):
+    id: int
+    counts: List[int]
+
+
+class PollTimeSeriesResponse(BaseModel):
+    poll_id: str
+    resolution: TimeSeriesResolution
+    interval: int
+    timestamps: List[int]
+    series: List[OptionTimeSeries]
+    total: List[int]
+
+
+class TrendingPoll(BaseModel):
+    poll_id: str
+    title: str
+    total_votes: int
+    expires_at: int
+    velocity: float
+
+
+class TrendingPollsResponse(BaseModel):
+    polls: List[TrendingPoll]
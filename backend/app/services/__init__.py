@@ -1,4 +1,7 @@
 from .poll_service import PollService
 from .vote_service import VoteService
+from .timeseries_service import TimeSeriesService
+from .trending_service import TrendingService
+from .tally_service import TallyService
 
-__all__ = ["PollService", "VoteService"]
+__all__ = ["PollService", "VoteService", "TimeSeriesService", "TrendingService", "TallyService"]
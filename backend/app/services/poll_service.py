@@ -1,51 +1,82 @@
-import uuid
+import secrets
 import time
 import json
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from redis.asyncio import Redis
 
 from app.core.config import settings
-from app.models.poll import PollOption, PollResponse
+from app.core.redis import read_with_fallback
+from app.models.poll import CreatePollRequest, PollOption, PollResponse
+from app.services.tally_service import TallyService
+
+# 原子写入投票：poll:{id} 已存在时放弃写入，避免 HSET 覆盖已有投票
+CREATE_POLL_SCRIPT = """
+local poll_key = KEYS[1]
+local options_key = KEYS[2]
+local stats_key = KEYS[3]
+local ttl = tonumber(ARGV[1])
+
+if redis.call('EXISTS', poll_key) == 1 then
+    return 0
+end
+
+local poll_data = cjson.decode(ARGV[2])
+for field, value in pairs(poll_data) do
+    redis.call('HSET', poll_key, field, value)
+end
+redis.call('EXPIRE', poll_key, ttl)
+
+for idx = 3, #ARGV do
+    redis.call('HSET', options_key, tostring(idx - 2), ARGV[idx])
+end
+redis.call('EXPIRE', options_key, ttl)
+
+redis.call('HSET', stats_key, 'total_votes', 0, 'unique_voters', 0)
+redis.call('EXPIRE', stats_key, ttl)
+
+return 1
+"""
 
 
 class PollService:
-    def __init__(self, redis: Redis):
+    def __init__(self, redis: Redis, read_redis: Optional[Redis] = None):
         self.redis = redis
+        self.read_redis = read_redis or redis
+        self._create_script = redis.register_script(CREATE_POLL_SCRIPT)
 
-    async def create_poll(
-        self,
+    @staticmethod
+    def generate_poll_id() -> str:
+        """生成8位十六进制投票ID"""
+        return secrets.token_hex(4)
+
+    @staticmethod
+    def _build_poll_payload(
         title: str,
         options: List[str],
         duration: str,
+        created_at: int,
         allow_multiple: bool = False,
         min_selection: Optional[int] = None,
-        max_selection: Optional[int] = None
-    ) -> tuple[str, int]:
-        """
-        创建投票
-
-        Returns:
-            (poll_id, expires_at)
-        """
-        # 生成投票ID
-        poll_id = str(uuid.uuid4())[:8]
+        max_selection: Optional[int] = None,
+        voting_method: str = "plurality"
+    ) -> Dict[str, Any]:
+        """构造单个投票的写入数据"""
+        # 认可投票即不限数量的多选；排序复选不使用多选配置
+        if voting_method == "approval":
+            allow_multiple = True
+        elif voting_method == "ranked":
+            allow_multiple = False
 
-        # 计算过期时间
         ttl = settings.duration_map.get(duration, 86400)
-        created_at = int(time.time())
         expires_at = created_at + ttl
 
-        # 使用Pipeline批量操作
-        pipe = self.redis.pipeline()
-
-        # 1. 存储投票主体
-        poll_key = f"poll:{poll_id}"
         poll_data = {
             "title": title,
-            "created_at": created_at,
-            "expires_at": expires_at,
+            "created_at": str(created_at),
+            "expires_at": str(expires_at),
             "duration": duration,
-            "allow_multiple": str(allow_multiple)
+            "allow_multiple": str(allow_multiple),
+            "voting_method": voting_method
         }
 
         # 添加多选配置（如果启用）
@@ -55,50 +86,172 @@ class PollService:
             if max_selection is not None:
                 poll_data["max_selection"] = str(max_selection)
 
-        pipe.hset(poll_key, mapping=poll_data)
-        pipe.expire(poll_key, ttl)
+        return {
+            "ttl": ttl,
+            "expires_at": expires_at,
+            "poll_data": poll_data,
+            "options": [
+                json.dumps({"text": option_text, "votes": 0})
+                for option_text in options
+            ]
+        }
+
+    async def _write_polls(self, payloads: List[Dict[str, Any]]) -> List[tuple[str, int]]:
+        """
+        批量写入投票，每轮仅一次Pipeline往返
+
+        ID冲突的投票会换新ID重试，最多 settings.poll_id_max_attempts 轮；
+        仍有投票无法分配ID时，删除本批已写入的投票后抛出异常，
+        保证整批要么全部创建、要么全部不创建，客户端可安全重试
+
+        Returns:
+            [(poll_id, expires_at), ...]，与 payloads 顺序一致
+        """
+        results: Dict[int, tuple[str, int]] = {}
+        pending = list(range(len(payloads)))
+
+        for _ in range(settings.poll_id_max_attempts):
+            if not pending:
+                break
+
+            # 同一批次内的ID也不能重复
+            candidates: Dict[int, str] = {}
+            used = set()
+            for idx in pending:
+                poll_id = self.generate_poll_id()
+                while poll_id in used:
+                    poll_id = self.generate_poll_id()
+                used.add(poll_id)
+                candidates[idx] = poll_id
+
+            pipe = self.redis.pipeline(transaction=False)
+            for idx in pending:
+                poll_id = candidates[idx]
+                payload = payloads[idx]
+                await self._create_script(
+                    keys=[
+                        f"poll:{poll_id}",
+                        f"poll:{poll_id}:options",
+                        f"poll:{poll_id}:stats"
+                    ],
+                    args=[
+                        payload["ttl"],
+                        json.dumps(payload["poll_data"]),
+                        *payload["options"]
+                    ],
+                    client=pipe
+                )
+            created = await pipe.execute()
+
+            still_pending = []
+            for idx, ok in zip(pending, created):
+                if int(ok) == 1:
+                    results[idx] = (candidates[idx], payloads[idx]["expires_at"])
+                else:
+                    still_pending.append(idx)
+            pending = still_pending
 
-        # 2. 存储选项
-        options_key = f"poll:{poll_id}:options"
-        for idx, option_text in enumerate(options, start=1):
-            option_data = {
-                "text": option_text,
-                "votes": 0
-            }
-            pipe.hset(options_key, str(idx), json.dumps(option_data))
-        pipe.expire(options_key, ttl)
+        if pending:
+            if results:
+                pipe = self.redis.pipeline(transaction=False)
+                for poll_id, _ in results.values():
+                    pipe.delete(
+                        f"poll:{poll_id}",
+                        f"poll:{poll_id}:options",
+                        f"poll:{poll_id}:stats"
+                    )
+                await pipe.execute()
+            raise RuntimeError("Failed to allocate unique poll id")
 
-        # 3. 初始化统计
-        stats_key = f"poll:{poll_id}:stats"
-        pipe.hset(stats_key, mapping={
-            "total_votes": 0,
-            "unique_voters": 0
-        })
-        pipe.expire(stats_key, ttl)
+        return [results[idx] for idx in range(len(payloads))]
 
-        await pipe.execute()
+    async def create_poll(
+        self,
+        title: str,
+        options: List[str],
+        duration: str,
+        allow_multiple: bool = False,
+        min_selection: Optional[int] = None,
+        max_selection: Optional[int] = None,
+        voting_method: str = "plurality"
+    ) -> tuple[str, int]:
+        """
+        创建投票
+
+        Returns:
+            (poll_id, expires_at)
+        """
+        payload = self._build_poll_payload(
+            title=title,
+            options=options,
+            duration=duration,
+            created_at=int(time.time()),
+            allow_multiple=allow_multiple,
+            min_selection=min_selection,
+            max_selection=max_selection,
+            voting_method=voting_method
+        )
+
+        created = await self._write_polls([payload])
+        return created[0]
+
+    async def create_polls(
+        self,
+        polls: List[CreatePollRequest]
+    ) -> List[tuple[str, int]]:
+        """
+        批量创建投票
+
+        Returns:
+            [(poll_id, expires_at), ...]，与请求顺序一致
+        """
+        created_at = int(time.time())
+        payloads = [
+            self._build_poll_payload(
+                title=poll.title,
+                options=poll.options,
+                duration=poll.duration,
+                created_at=created_at,
+                allow_multiple=poll.allow_multiple,
+                min_selection=poll.min_selection,
+                max_selection=poll.max_selection,
+                voting_method=poll.voting_method
+            )
+            for poll in polls
+        ]
 
-        return poll_id, expires_at
+        return await self._write_polls(payloads)
 
     async def get_poll(
         self,
         poll_id: str
     ) -> Optional[PollResponse]:
-        """获取投票详情
+        """获取投票详情（优先从只读副本读取）
 
         注意：不进行服务端IP检测，has_voted和voted_for由客户端本地存储管理
         """
+        return await read_with_fallback(
+            lambda client: self._read_poll(client, poll_id),
+            self.redis,
+            self.read_redis
+        )
+
+    async def _read_poll(
+        self,
+        client: Redis,
+        poll_id: str
+    ) -> Optional[PollResponse]:
         poll_key = f"poll:{poll_id}"
 
         # 检查投票是否存在
-        exists = await self.redis.exists(poll_key)
+        exists = await client.exists(poll_key)
         if not exists:
             return None
 
         # 获取投票数据
-        poll_data = await self.redis.hgetall(poll_key)
-        options_data = await self.redis.hgetall(f"poll:{poll_id}:options")
-        stats_data = await self.redis.hgetall(f"poll:{poll_id}:stats")
+        poll_data = await client.hgetall(poll_key)
+        options_data = await client.hgetall(f"poll:{poll_id}:options")
+        stats_data = await client.hgetall(f"poll:{poll_id}:stats")
 
         # 构造选项列表
         options = []
@@ -118,6 +271,15 @@ class PollService:
         min_selection = int(poll_data["min_selection"]) if "min_selection" in poll_data else None
         max_selection = int(poll_data["max_selection"]) if "max_selection" in poll_data else None
 
+        # 排序复选附带逐轮结果（按版本缓存）
+        voting_method = poll_data.get("voting_method", "plurality")
+        ranked_result = None
+        if voting_method == "ranked":
+            ranked_result = await TallyService(client).get_ranked_result(
+                poll_id,
+                [option.id for option in options]
+            )
+
         return PollResponse(
             poll_id=poll_id,
             title=poll_data["title"],
@@ -128,7 +290,9 @@ class PollService:
             voted_for=None,  # 由客户端本地存储管理
             allow_multiple=allow_multiple,
             min_selection=min_selection,
-            max_selection=max_selection
+            max_selection=max_selection,
+            voting_method=voting_method,
+            ranked_result=ranked_result
         )
 
     async def check_poll_exists(self, poll_id: str) -> bool:
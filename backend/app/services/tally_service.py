@@ -0,0 +1,164 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from redis.asyncio import Redis
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.poll import RankedResult, RankedRound, RankedTally
+
+
+def encode_ballot(ranking: List[int]) -> str:
+    """排序选票编码为 poll:{id}:ballots 中的字段，例如 [3, 1, 2] -> "3,1,2" """
+    return ",".join(str(opt_id) for opt_id in ranking)
+
+
+def tally_instant_runoff(
+    option_ids: List[int],
+    ballots: Dict[str, int],
+    version: int = 0
+) -> RankedResult:
+    """
+    即时决选（IRV）计票
+
+    ballots 为选票模式 -> 张数，每轮对所有模式做向量化计数，
+    耗时与不同模式数成正比，与选票总数无关
+    """
+    num_options = len(option_ids)
+    width = max(num_options, 1)
+
+    # 选票模式矩阵：每行一种模式，按偏好顺序存选项下标，不足处填 -1
+    patterns = np.full((len(ballots), width), -1, dtype=np.int64)
+    counts = np.fromiter(
+        (int(v) for v in ballots.values()),
+        dtype=np.int64,
+        count=len(ballots)
+    )
+
+    if ballots and num_options:
+        # 所有模式拼接后一次性解析，再按每个模式的长度还原行号
+        keys = np.array(list(ballots.keys()))
+        lengths = np.char.count(keys, ",") + 1
+        flat = np.array(",".join(ballots.keys()).split(","), dtype=np.int64)
+        rows = np.repeat(np.arange(len(keys)), lengths)
+
+        # 选项ID -> 下标，忽略已不存在的选项
+        ids = np.asarray(option_ids, dtype=np.int64)
+        order = np.argsort(ids)
+        pos = np.minimum(np.searchsorted(ids[order], flat), num_options - 1)
+        valid = ids[order][pos] == flat
+        rows = rows[valid]
+        # 有效选项在本行中的序号即列号
+        cols = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        keep = cols < width
+        patterns[rows[keep], cols[keep]] = order[pos[valid]][keep]
+
+    active = np.ones(num_options, dtype=bool)
+    rounds: List[RankedRound] = []
+    first_round: Optional[np.ndarray] = None
+    winner: Optional[int] = None
+
+    while active.any():
+        # 每张选票计入其排序中第一个未淘汰的选项
+        usable = (patterns >= 0) & active[np.maximum(patterns, 0)]
+        has_choice = usable.any(axis=1)
+        top = patterns[np.arange(len(patterns)), usable.argmax(axis=1)]
+        tallies = np.bincount(
+            top[has_choice],
+            weights=counts[has_choice],
+            minlength=num_options
+        ).astype(np.int64)
+        if first_round is None:
+            first_round = tallies
+
+        round_result = RankedRound(
+            round=len(rounds) + 1,
+            tallies=[
+                RankedTally(id=option_ids[i], votes=int(tallies[i]))
+                for i in np.flatnonzero(active)
+            ],
+            exhausted=int(counts[~has_choice].sum())
+        )
+        rounds.append(round_result)
+
+        continuing = int(tallies[active].sum())
+        if continuing == 0:
+            break
+
+        leader = int(np.flatnonzero(active)[np.argmax(tallies[active])])
+        if tallies[leader] * 2 > continuing or active.sum() == 1:
+            winner = option_ids[leader]
+            break
+
+        # 淘汰票数最少的选项；平票时淘汰首轮票数更少者，再平则淘汰ID较大者
+        candidates = np.flatnonzero(active & (tallies == tallies[active].min()))
+        eliminated = int(max(candidates, key=lambda i: (-first_round[i], i)))
+        active[eliminated] = False
+        round_result.eliminated = option_ids[eliminated]
+
+    return RankedResult(version=version, rounds=rounds, winner=winner)
+
+
+class TallyService:
+    # 进程内结果缓存：poll_id -> (计票时间, RankedResult)
+    _cache: "OrderedDict[str, tuple[float, RankedResult]]" = OrderedDict()
+    # 正在重新计票的投票，并发读取共享同一次计票
+    _tasks: Dict[str, asyncio.Task] = {}
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    async def get_ranked_result(
+        self,
+        poll_id: str,
+        option_ids: List[int]
+    ) -> RankedResult:
+        """
+        获取排序复选的逐轮结果
+
+        每张新选票都会使 poll:{id}:stats 中的 ballot_version 加一。
+        缓存版本不低于当前版本（如副本落后）或仍在刷新窗口内时直接返回缓存，
+        否则重新计票：每个窗口最多一次，并发读取共享同一个计票任务
+        """
+        version = int(await self.redis.hget(f"poll:{poll_id}:stats", "ballot_version") or 0)
+
+        cached = self._cache.get(poll_id)
+        if cached is not None:
+            computed_at, result = cached
+            if (
+                result.version >= version
+                or time.monotonic() - computed_at < settings.tally_refresh_interval
+            ):
+                self._cache.move_to_end(poll_id)
+                return result
+
+        task = self._tasks.get(poll_id)
+        if task is None:
+            task = asyncio.create_task(self._recount(poll_id, option_ids, version))
+            self._tasks[poll_id] = task
+        return await asyncio.shield(task)
+
+    async def _recount(
+        self,
+        poll_id: str,
+        option_ids: List[int],
+        version: int
+    ) -> RankedResult:
+        try:
+            ballots = await self.redis.hgetall(f"poll:{poll_id}:ballots")
+            # 计票为CPU密集操作，放到线程中执行，避免阻塞事件循环
+            result = await asyncio.to_thread(tally_instant_runoff, option_ids, ballots, version)
+        finally:
+            self._tasks.pop(poll_id, None)
+
+        # 不用旧版本覆盖新结果
+        cached = self._cache.get(poll_id)
+        if cached is None or cached[1].version <= version:
+            self._cache[poll_id] = (time.monotonic(), result)
+            self._cache.move_to_end(poll_id)
+            while len(self._cache) > settings.tally_cache_size:
+                self._cache.popitem(last=False)
+
+        return result
@@ -0,0 +1,101 @@
+import time
+from typing import Optional
+from redis.asyncio import Redis
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.redis import read_with_fallback
+from app.models.poll import OptionTimeSeries, PollTimeSeriesResponse
+
+
+class TimeSeriesService:
+    def __init__(self, redis: Redis, read_redis: Optional[Redis] = None):
+        self.redis = redis
+        self.read_redis = read_redis or redis
+
+    async def get_timeseries(
+        self,
+        poll_id: str,
+        resolution: str = "1m"
+    ) -> Optional[PollTimeSeriesResponse]:
+        """
+        获取投票的降采样时间序列
+
+        poll:{id}:timeseries 中按分钟存储每个选项的票数（字段：minute:option_id），
+        这里一次Pipeline读取（优先只读副本）后用numpy聚合到目标分辨率
+        每个选项最多返回 settings.timeseries_max_buckets 个点（最近的时间窗口）
+        """
+        return await read_with_fallback(
+            lambda client: self._read_timeseries(client, poll_id, resolution),
+            self.redis,
+            self.read_redis
+        )
+
+    async def _read_timeseries(
+        self,
+        client: Redis,
+        poll_id: str,
+        resolution: str
+    ) -> Optional[PollTimeSeriesResponse]:
+        poll_key = f"poll:{poll_id}"
+
+        pipe = client.pipeline(transaction=False)
+        pipe.hmget(poll_key, "created_at", "expires_at")
+        pipe.hkeys(f"poll:{poll_id}:options")
+        pipe.hgetall(f"poll:{poll_id}:timeseries")
+        (created_at, expires_at), option_keys, buckets = await pipe.execute()
+
+        if created_at is None or expires_at is None:
+            return None
+
+        interval = settings.timeseries_resolution_map[resolution]
+        option_ids = sorted(int(opt_id) for opt_id in option_keys)
+
+        # 时间轴：从创建时间所在桶到当前（或过期时间）所在桶，
+        # 超过 timeseries_max_buckets 时只保留最近的部分
+        start = int(created_at) // interval * interval
+        end = min(int(time.time()), int(expires_at))
+        num_buckets = max(end - start, 0) // interval + 1
+        if num_buckets > settings.timeseries_max_buckets:
+            start += (num_buckets - settings.timeseries_max_buckets) * interval
+            num_buckets = settings.timeseries_max_buckets
+
+        counts = np.zeros((len(option_ids), num_buckets), dtype=np.int64)
+
+        if buckets and option_ids:
+            fields = np.array(
+                [field.split(":", 1) for field in buckets.keys()],
+                dtype=np.int64
+            ).reshape(-1, 2)
+            values = np.fromiter(
+                (int(v) for v in buckets.values()),
+                dtype=np.int64,
+                count=len(buckets)
+            )
+
+            # 选项ID -> 行号，分钟 -> 列号
+            ids = np.asarray(option_ids, dtype=np.int64)
+            rows = np.searchsorted(ids, fields[:, 1])
+            cols = (fields[:, 0] * 60 - start) // interval
+
+            valid = (
+                (rows < len(ids))
+                & (ids[np.minimum(rows, len(ids) - 1)] == fields[:, 1])
+                & (cols >= 0)
+                & (cols < num_buckets)
+            )
+
+            np.add.at(counts, (rows[valid], cols[valid]), values[valid])
+
+        return PollTimeSeriesResponse(
+            poll_id=poll_id,
+            resolution=resolution,
+            interval=interval,
+            timestamps=(start + np.arange(num_buckets, dtype=np.int64) * interval).tolist(),
+            series=[
+                OptionTimeSeries(id=opt_id, counts=row.tolist())
+                for opt_id, row in zip(option_ids, counts)
+            ],
+            total=counts.sum(axis=0).tolist()
+        )
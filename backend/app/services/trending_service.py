@@ -0,0 +1,97 @@
+import math
+import time
+from typing import Dict, List
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.models.poll import TrendingPoll
+
+# 全局热度索引：member=poll_id, score=log(衰减票数) + t/tau（由投票脚本维护）
+TRENDING_KEY = "polls:trending"
+# 过期索引：member=poll_id, score=expires_at，用于清理热度索引
+TRENDING_EXPIRY_KEY = "polls:trending:expiry"
+
+# 清理过期投票并取Top-K，一次往返返回展示所需字段
+# 注意：脚本会读取未声明在KEYS中的 poll:{id} 键，只能在单节点Redis的主节点上执行（不支持Cluster，也不会路由到只读副本）
+TRENDING_SCRIPT = """
+local trending_key = KEYS[1]
+local expiry_key = KEYS[2]
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local prune_batch = tonumber(ARGV[3])
+
+-- 清理已过期的投票
+local expired = redis.call('ZRANGEBYSCORE', expiry_key, '-inf', now, 'LIMIT', 0, prune_batch)
+if #expired > 0 then
+    redis.call('ZREM', trending_key, unpack(expired))
+    redis.call('ZREM', expiry_key, unpack(expired))
+end
+
+local result = {}
+local top = redis.call('ZREVRANGE', trending_key, 0, limit - 1, 'WITHSCORES')
+for i = 1, #top, 2 do
+    local poll_id = top[i]
+    local poll = redis.call('HMGET', 'poll:' .. poll_id, 'title', 'expires_at')
+    if poll[1] then
+        local total_votes = redis.call('HGET', 'poll:' .. poll_id .. ':stats', 'total_votes') or '0'
+        table.insert(result, poll_id)
+        table.insert(result, top[i + 1])
+        table.insert(result, poll[1])
+        table.insert(result, poll[2])
+        table.insert(result, total_votes)
+    else
+        -- 投票已提前消失，顺带移除
+        redis.call('ZREM', trending_key, poll_id)
+        redis.call('ZREM', expiry_key, poll_id)
+    end
+end
+
+return result
+"""
+
+
+class TrendingService:
+    # 进程内短时缓存：limit -> (过期时间, 结果)
+    _cache: Dict[int, tuple[float, List[TrendingPoll]]] = {}
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._trending_script = redis.register_script(TRENDING_SCRIPT)
+
+    async def get_trending(self, limit: int = 10) -> List[TrendingPoll]:
+        """
+        获取热门投票（按指数衰减的投票速率排序）
+
+        velocity 为当前的衰减投票速率（票/分钟）
+        """
+        cache_ttl = settings.trending_cache_ttl
+        if cache_ttl > 0:
+            cached = self._cache.get(limit)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+
+        now = time.time()
+        tau = settings.trending_decay_seconds
+
+        raw = await self._trending_script(
+            keys=[TRENDING_KEY, TRENDING_EXPIRY_KEY],
+            args=[int(now), limit, settings.trending_prune_batch]
+        )
+
+        polls = []
+        for i in range(0, len(raw), 5):
+            poll_id, score, title, expires_at, total_votes = raw[i:i + 5]
+            # 还原当前时刻的衰减票数，再换算为每分钟速率
+            decayed = math.exp(float(score) - now / tau)
+            polls.append(TrendingPoll(
+                poll_id=poll_id,
+                title=title,
+                total_votes=int(total_votes),
+                expires_at=int(expires_at),
+                velocity=decayed / tau * 60
+            ))
+
+        if cache_ttl > 0:
+            self._cache[limit] = (time.monotonic() + cache_ttl, polls)
+
+        return polls
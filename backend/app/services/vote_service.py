@@ -1,9 +1,13 @@
 import json
+import time
 from typing import Optional, List, Union, Dict, Any
 from redis.asyncio import Redis
 from redis.exceptions import ResponseError
 
+from app.core.config import settings
 from app.models.poll import PollOption
+from app.services.trending_service import TRENDING_KEY, TRENDING_EXPIRY_KEY
+from app.services.tally_service import encode_ballot
 
 
 class VoteService:
@@ -14,10 +18,13 @@ class VoteService:
         self,
         poll_id: str,
         option_id: Optional[int] = None,
-        option_ids: Optional[List[int]] = None
+        option_ids: Optional[List[int]] = None,
+        ranking: Optional[List[int]] = None
     ) -> tuple[bool, Optional[Union[str, Dict[str, Any]]], List[PollOption], int]:
         """
-        投票（支持单选和多选）
+        投票（支持单选、多选和排序复选）
+
+        排序复选的选票按模式计数存入 poll:{id}:ballots，选项票数记录首选票
 
         注意：不进行服务端IP检测，投票限制由客户端本地存储实现
 
@@ -26,7 +33,9 @@ class VoteService:
         """
         # 确定投票的选项列表
         voting_options = []
-        if option_ids is not None and len(option_ids) > 0:
+        if ranking is not None and len(ranking) > 0:
+            voting_options = ranking
+        elif option_ids is not None and len(option_ids) > 0:
             voting_options = option_ids
         elif option_id is not None:
             voting_options = [option_id]
@@ -44,9 +53,16 @@ class VoteService:
         allow_multiple = poll_data.get("allow_multiple", "False") == "True"
         min_selection = int(poll_data.get("min_selection", 1)) if "min_selection" in poll_data else None
         max_selection = int(poll_data.get("max_selection", 1)) if "max_selection" in poll_data else None
+        voting_method = poll_data.get("voting_method", "plurality")
+
+        # 验证计票方式
+        if voting_method == "ranked" and ranking is None:
+            return False, {"code": "RANKING_REQUIRED"}, [], 0
+        if voting_method != "ranked" and ranking is not None:
+            return False, {"code": "RANKING_NOT_ALLOWED"}, [], 0
 
         # 验证多选配置
-        if not allow_multiple and len(voting_options) > 1:
+        if voting_method != "ranked" and not allow_multiple and len(voting_options) > 1:
             return False, {"code": "MULTIPLE_NOT_ALLOWED"}, [], 0
 
         if allow_multiple:
@@ -67,11 +83,30 @@ class VoteService:
         if poll_ttl <= 0:
             return False, {"code": "POLL_EXPIRED"}, [], 0
 
+        # 排序复选只为首选计票，完整排序作为选票模式记录
+        if ranking is not None:
+            counted_options = ranking[:1]
+            ballot = encode_ballot(ranking)
+        else:
+            counted_options = voting_options
+            ballot = ""
+
         # 使用Lua脚本执行原子操作（支持多选）
         lua_script = """
         local options_key = KEYS[1]
         local stats_key = KEYS[2]
+        local timeseries_key = KEYS[3]
+        local trending_key = KEYS[4]
+        local expiry_key = KEYS[5]
+        local ballots_key = KEYS[6]
         local option_ids_json = ARGV[1]
+        local minute = ARGV[2]
+        local expires_at = ARGV[3]
+        local poll_id = ARGV[4]
+        local now = tonumber(ARGV[5])
+        local tau = tonumber(ARGV[6])
+        local ballot = ARGV[7]
+        local prune_batch = tonumber(ARGV[8])
 
         -- 解析选项ID列表
         local option_ids = cjson.decode(option_ids_json)
@@ -86,22 +121,64 @@ class VoteService:
             local option_data = cjson.decode(option_json)
             option_data.votes = option_data.votes + 1
             redis.call('HSET', options_key, tostring(option_id), cjson.encode(option_data))
+
+            -- 按分钟累计选项票数（字段：minute:option_id）
+            redis.call('HINCRBY', timeseries_key, minute .. ':' .. tostring(option_id), 1)
+        end
+
+        -- 时间序列随投票一起过期
+        redis.call('EXPIREAT', timeseries_key, expires_at)
+
+        -- 排序复选：按选票模式计数，版本号用于结果缓存失效
+        if ballot ~= '' then
+            redis.call('HINCRBY', ballots_key, ballot, 1)
+            redis.call('EXPIREAT', ballots_key, expires_at)
+            redis.call('HINCRBY', stats_key, 'ballot_version', 1)
         end
 
         -- 增加总投票数（按选项数量）
         redis.call('HINCRBY', stats_key, 'total_votes', #option_ids)
         redis.call('HINCRBY', stats_key, 'unique_voters', 1)
 
+        -- 更新热度：指数衰减的投票速率
+        -- 有序集合存 log(score) + t/tau，与任意时刻的衰减值同序，无需定期重算
+        local trend = redis.call('HMGET', stats_key, 'trend_score', 'trend_ts')
+        local score = tonumber(trend[1]) or 0
+        local last = tonumber(trend[2]) or now
+        score = score * math.exp(math.min(last - now, 0) / tau) + 1
+        redis.call('HSET', stats_key, 'trend_score', tostring(score), 'trend_ts', tostring(now))
+        redis.call('ZADD', trending_key, math.log(score) + now / tau, poll_id)
+        redis.call('ZADD', expiry_key, expires_at, poll_id)
+
+        -- 顺带清理一小批已过期的投票，热度索引不依赖查询接口也能收缩
+        local expired = redis.call('ZRANGEBYSCORE', expiry_key, '-inf', now, 'LIMIT', 0, prune_batch)
+        if #expired > 0 then
+            redis.call('ZREM', trending_key, unpack(expired))
+            redis.call('ZREM', expiry_key, unpack(expired))
+        end
+
         return 'OK'
         """
 
         try:
+            now = time.time()
             await self.redis.eval(
                 lua_script,
-                2,
+                6,
                 options_key,
                 f"poll:{poll_id}:stats",
-                json.dumps(voting_options)
+                f"poll:{poll_id}:timeseries",
+                TRENDING_KEY,
+                TRENDING_EXPIRY_KEY,
+                f"poll:{poll_id}:ballots",
+                json.dumps(counted_options),
+                int(now) // 60,
+                poll_data["expires_at"],
+                poll_id,
+                now,
+                settings.trending_decay_seconds,
+                ballot,
+                settings.trending_vote_prune_batch
             )
         except ResponseError as e:
             message = str(e)
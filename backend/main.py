@@ -73,7 +73,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     """健康检查"""
-    from app.core.redis import get_redis
+    from app.core.redis import get_redis, replica_clients, healthy_replicas
 
     try:
         redis = get_redis()
@@ -84,7 +84,8 @@ async def health_check():
 
     return {
         "status": "ok",
-        "redis": redis_status
+        "redis": redis_status,
+        "redis_replicas": f"{len(healthy_replicas)}/{len(replica_clients)} healthy"
     }
 
 
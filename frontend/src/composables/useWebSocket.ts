@@ -1,6 +1,7 @@
 import { ref, onUnmounted } from 'vue'
 import { io, Socket } from 'socket.io-client'
 import { useI18n } from 'vue-i18n'
+import type { Poll, RankedResult } from '@/types/poll'
 
 export interface VoteUpdatePayload {
   option_id: number
@@ -8,6 +9,10 @@ export interface VoteUpdatePayload {
   total_votes: number
 }
 
+export type JoinPollResult =
+  | { success: true; poll: Poll }
+  | { success: false; code: string }
+
 export function useWebSocket() {
   const { t } = useI18n()
   const socket = ref<Socket | null>(null)
@@ -46,7 +51,25 @@ export function useWebSocket() {
     }
   }
 
+  // 投票不存在时服务端返回的错误码，不再重试加入
+  const NOT_FOUND_CODES = ['POLL_NOT_FOUND', 'INVALID_POLL_ID']
+
+  let rejoinHandler: (() => void) | null = null
+  let rejoinTimer: ReturnType<typeof setTimeout> | null = null
+
+  const stopRejoin = () => {
+    if (rejoinHandler) {
+      socket.value?.off('connect', rejoinHandler)
+      rejoinHandler = null
+    }
+    if (rejoinTimer) {
+      clearTimeout(rejoinTimer)
+      rejoinTimer = null
+    }
+  }
+
   const disconnect = () => {
+    stopRejoin()
     if (socket.value) {
       socket.value.disconnect()
       socket.value = null
@@ -54,22 +77,68 @@ export function useWebSocket() {
     }
   }
 
-  const joinPoll = (pollId: string) => {
-    if (!socket.value) return
-
-    const emitJoin = () => {
-      socket.value?.emit('join_poll', { poll_id: pollId })
-      console.log('Joined poll:', pollId)
-    }
-
-    if (socket.value.connected) {
-      emitJoin()
-    } else {
-      socket.value.once('connect', emitJoin)
-    }
+  // 加入房间并获取投票快照；首次加入失败或超时返回 null，由调用方回退到 REST，
+  // 同时在后台继续重试直到进入房间，每次重新连接后也会重新加入
+  const joinPoll = (pollId: string): Promise<JoinPollResult | null> => {
+    stopRejoin()
+
+    return new Promise((resolve) => {
+      if (!socket.value) {
+        resolve(null)
+        return
+      }
+
+      let settled = false
+      let retryDelay = 1000
+      const settle = (result: JoinPollResult | null) => {
+        if (!settled) {
+          settled = true
+          resolve(result)
+        }
+      }
+
+      const emitJoin = () => {
+        if (rejoinTimer) {
+          clearTimeout(rejoinTimer)
+          rejoinTimer = null
+        }
+
+        socket.value?.timeout(5000).emit(
+          'join_poll',
+          { poll_id: pollId },
+          (err: Error | null, result: JoinPollResult) => {
+            if (!err && (result.success || NOT_FOUND_CODES.includes(result.code))) {
+              if (!result.success) stopRejoin()
+              settle(result)
+              return
+            }
+
+            // 超时或服务端临时错误：稍后重试加入
+            settle(err ? null : result)
+            if (rejoinHandler) {
+              rejoinTimer = setTimeout(() => {
+                if (socket.value?.connected) emitJoin()
+              }, retryDelay)
+              retryDelay = Math.min(retryDelay * 2, 30000)
+            }
+          }
+        )
+        console.log('Joined poll:', pollId)
+      }
+
+      rejoinHandler = emitJoin
+      socket.value.on('connect', emitJoin)
+
+      if (socket.value.connected) {
+        emitJoin()
+      } else {
+        socket.value.once('connect_error', () => settle(null))
+      }
+    })
   }
 
   const leavePoll = (pollId: string) => {
+    stopRejoin()
     if (socket.value && isConnected.value) {
       socket.value.emit('leave_poll', { poll_id: pollId })
       console.log('Left poll:', pollId)
@@ -82,6 +151,18 @@ export function useWebSocket() {
     }
   }
 
+  const onRankedUpdate = (callback: (data: RankedResult) => void) => {
+    if (socket.value) {
+      socket.value.on('ranked_update', callback)
+    }
+  }
+
+  const offRankedUpdate = () => {
+    if (socket.value) {
+      socket.value.off('ranked_update')
+    }
+  }
+
   const onPollExpired = (callback: () => void) => {
     if (socket.value) {
       socket.value.on('poll_expired', callback)
@@ -115,6 +196,8 @@ export function useWebSocket() {
     leavePoll,
     onVoteUpdate,
     onPollExpired,
+    onRankedUpdate,
+    offRankedUpdate,
     offVoteUpdate,
     offPollExpired
   }
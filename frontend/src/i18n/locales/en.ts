@@ -58,6 +58,12 @@ export default {
     pickMore: 'Pick {count} more option | Pick {count} more options',
     recorded: 'Recorded',
     votesCount: '{count} vote | {count} votes',
+    rankedChoice: 'Ranked Choice',
+    rankedDesc: 'Tap options in order of preference',
+    submitRanking: 'Submit Ranking ({count})',
+    winner: 'Winner',
+    eliminatedInRound: 'Out in round {round}',
+    rankedRounds: 'Instant runoff · {count} round | Instant runoff · {count} rounds',
   },
   notFound: {
     title: 'Signal Lost',
@@ -88,5 +94,7 @@ export default {
     missingOption: 'Please choose at least one option',
     createFailed: 'Failed to create poll, please try again',
     voteFailed: 'Failed to submit vote, please try again',
+    rankingRequired: 'This poll requires a ranked ballot',
+    rankingNotAllowed: 'This poll does not accept ranked ballots',
   },
 }
@@ -58,6 +58,12 @@ export default {
     pickMore: '还需选择 {count} 项',
     recorded: '已记录',
     votesCount: '{count} 票',
+    rankedChoice: '排序投票',
+    rankedDesc: '按偏好顺序依次点选选项',
+    submitRanking: '提交排序（{count}）',
+    winner: '胜出',
+    eliminatedInRound: '第 {round} 轮淘汰',
+    rankedRounds: '即时决选 · 共 {count} 轮',
   },
   notFound: {
     title: '信号丢失',
@@ -88,5 +94,7 @@ export default {
     missingOption: '请至少选择一个选项',
     createFailed: '创建失败，请重试',
     voteFailed: '投票失败，请重试',
+    rankingRequired: '该投票需要提交排序选票',
+    rankingNotAllowed: '该投票不接受排序选票',
   },
 }
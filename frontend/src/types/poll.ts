@@ -4,6 +4,26 @@ export interface PollOption {
   votes: number
 }
 
+export type VotingMethod = 'plurality' | 'approval' | 'ranked'
+
+export interface RankedTally {
+  id: number
+  votes: number
+}
+
+export interface RankedRound {
+  round: number
+  tallies: RankedTally[]
+  exhausted: number
+  eliminated: number | null
+}
+
+export interface RankedResult {
+  version: number
+  rounds: RankedRound[]
+  winner: number | null
+}
+
 export interface Poll {
   poll_id: string
   title: string
@@ -15,6 +35,8 @@ export interface Poll {
   allow_multiple?: boolean
   min_selection?: number
   max_selection?: number
+  voting_method?: VotingMethod
+  ranked_result?: RankedResult | null
 }
 
 export interface CreatePollRequest {
@@ -24,6 +46,7 @@ export interface CreatePollRequest {
   allow_multiple?: boolean
   min_selection?: number
   max_selection?: number
+  voting_method?: VotingMethod
 }
 
 export interface CreatePollResponse {
@@ -35,6 +58,7 @@ export interface CreatePollResponse {
 export interface VoteRequest {
   option_id?: number
   option_ids?: number[]
+  ranking?: number[]
 }
 
 export interface VoteResponse {
@@ -34,7 +34,9 @@ const codeKeyMap: Record<string, string> = {
   MAX_SELECTION: 'errors.maxSelection',
   MISSING_OPTION: 'errors.missingOption',
   CREATE_FAILED: 'errors.createFailed',
-  VOTE_FAILED: 'errors.voteFailed'
+  VOTE_FAILED: 'errors.voteFailed',
+  RANKING_REQUIRED: 'errors.rankingRequired',
+  RANKING_NOT_ALLOWED: 'errors.rankingNotAllowed'
 }
 
 const legacyMatchers: Array<{